@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+import pandas as pd
+
+from benchmarks.synthetic_data import generate_preset
+
+# Helpers shared by the benchmark and load-test scripts
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CSV_RELATIVE_PATH = os.path.join('results', 'collected_partial_summary.csv')
+TRAINING_METHOD_ORDER = ['Teacher', 'Direct', 'TaskOnly', 'RDT', 'Follower']
+
+
+def prepare_workspace(size, seed, data_dir=None):
+    """
+    Creates a directory laid out like the repo root (results/ CSV plus a link to visual/),
+    so index(), serve_plot() and generate_static.py can run unchanged against synthetic data.
+    When data_dir is given the generated CSV is cached there and reused across runs.
+    """
+    workspace = tempfile.mkdtemp(prefix=f'rdt_bench_{size}_')
+    os.makedirs(os.path.join(workspace, 'results'))
+    os.symlink(os.path.join(REPO_ROOT, 'visual'), os.path.join(workspace, 'visual'))
+    csv_path = os.path.join(workspace, CSV_RELATIVE_PATH)
+
+    if data_dir:
+        cached_csv = os.path.join(os.path.abspath(data_dir), f'synthetic_{size}_seed{seed}.csv')
+        if not os.path.exists(cached_csv):
+            generate_preset(cached_csv, size, seed=seed)
+        os.symlink(cached_csv, csv_path)
+    else:
+        generate_preset(csv_path, size, seed=seed)
+    return workspace, csv_path
+
+
+def plot_group(processed_df, target):
+    """Same filtering and ordering serve_plot() does before plotting."""
+    group = processed_df[
+        (processed_df['dataset'] == target['dataset']) &
+        (processed_df['horizon'].astype(str) == str(target['horizon'])) &
+        (processed_df['student_model_arch'] == target['student_arch']) &
+        (processed_df['metric'] == target['metric']) &
+        (processed_df['split'] == 'test') &
+        (processed_df['teacher_model'] == target['teacher'])
+    ].copy()
+    group['training_method'] = pd.Categorical(group['training_method'],
+                                              categories=TRAINING_METHOD_ORDER, ordered=True)
+    group.sort_values('training_method', inplace=True)
+    return group
@@ -0,0 +1,102 @@
+import argparse
+import json
+import sys
+
+
+def load_results(path):
+    """
+    Returns (results, errors) for a results JSON: {(size, stage): result} for the
+    successful entries and {(size, stage): message} for the stages that failed.
+    """
+    with open(path, encoding='utf-8') as f:
+        report = json.load(f)
+    results = {(r['size'], r['stage']): r for r in report['results'] if 'error' not in r}
+    errors = {(r['size'], r['stage']): r['error'] for r in report['results'] if 'error' in r}
+    return results, errors
+
+
+def compare(baseline, current, threshold=0.10, min_time_s=0.005, memory_threshold=None):
+    """
+    Compares two result sets stage by stage.
+    A stage regresses when its median time grows by more than `threshold` (relative)
+    and by more than `min_time_s` (absolute, to ignore timer noise on very fast stages).
+    Peak memory is checked the same way when memory_threshold is given.
+    Returns a list of row dicts and whether any regression was found.
+    """
+    rows = []
+    regressed = False
+    for key in sorted(set(baseline) & set(current)):
+        base, cur = baseline[key], current[key]
+        time_ratio = cur['median_s'] / base['median_s'] if base['median_s'] > 0 else float('inf')
+        time_regressed = (time_ratio > 1 + threshold) and (cur['median_s'] - base['median_s'] > min_time_s)
+
+        mem_ratio = None
+        mem_regressed = False
+        if base.get('peak_mem_mb') and cur.get('peak_mem_mb') is not None:
+            mem_ratio = cur['peak_mem_mb'] / base['peak_mem_mb']
+            mem_regressed = memory_threshold is not None and mem_ratio > 1 + memory_threshold
+
+        regressed = regressed or time_regressed or mem_regressed
+        rows.append({
+            'size': key[0], 'stage': key[1],
+            'base_s': base['median_s'], 'current_s': cur['median_s'], 'time_ratio': time_ratio,
+            'base_mem_mb': base.get('peak_mem_mb'), 'current_mem_mb': cur.get('peak_mem_mb'),
+            'mem_ratio': mem_ratio,
+            'status': 'REGRESSION' if (time_regressed or mem_regressed) else 'ok',
+        })
+    return rows, regressed
+
+
+def print_table(rows):
+    header = f"{'size':<8} {'stage':<16} {'base (s)':>10} {'current (s)':>12} {'ratio':>7} {'mem ratio':>10}  status"
+    print(header)
+    print('-' * len(header))
+    for r in rows:
+        mem_ratio = f"{r['mem_ratio']:.2f}" if r['mem_ratio'] is not None else 'n/a'
+        print(f"{r['size']:<8} {r['stage']:<16} {r['base_s']:>10.4f} {r['current_s']:>12.4f} "
+              f"{r['time_ratio']:>7.2f} {mem_ratio:>10}  {r['status']}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare two benchmark result files.')
+    parser.add_argument('baseline', help='Results JSON from the reference commit')
+    parser.add_argument('current', help='Results JSON from the commit under test')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='Allowed relative slowdown of the median time (default: 0.10 = 10%%)')
+    parser.add_argument('--min-time', type=float, default=0.005,
+                        help='Ignore slowdowns smaller than this many seconds')
+    parser.add_argument('--memory-threshold', type=float,
+                        help='Also fail when peak memory grows by more than this fraction')
+    parser.add_argument('--allow-missing', action='store_true',
+                        help='Do not fail on baseline stages absent from the current file '
+                             '(e.g. when it was produced with a narrower --stages)')
+    args = parser.parse_args()
+
+    baseline, _ = load_results(args.baseline)
+    current, current_errors = load_results(args.current)
+    rows, regressed = compare(baseline, current, args.threshold, args.min_time, args.memory_threshold)
+    print_table(rows)
+
+    # A stage that crashed or was not run cannot be shown to be fast enough
+    failed = False
+    if current_errors:
+        failed = True
+        print("\nStages that failed in current results:")
+        for (size, stage), message in sorted(current_errors.items()):
+            print(f"  {size}/{stage}: {message}")
+
+    missing = sorted(set(baseline) - set(current) - set(current_errors))
+    if missing:
+        print(f"\nStages missing from current results: {missing}")
+        if args.allow_missing:
+            print("(ignored because of --allow-missing)")
+        else:
+            failed = True
+
+    if regressed:
+        print(f"\nRegression detected (threshold {args.threshold:.0%}).")
+    if failed:
+        print("\nBenchmark check failed: some stages errored or were not run.")
+    if regressed or failed:
+        sys.exit(1)
+    print("\nNo regressions.")
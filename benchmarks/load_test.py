@@ -0,0 +1,463 @@
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.synthetic_data import SIZE_PRESETS
+from benchmarks.common import CSV_RELATIVE_PATH, TRAINING_METHOD_ORDER, prepare_workspace, plot_group
+from visual.data_processor import load_and_process_data
+from visual.plotter import generate_plot_to_bytes
+
+# Browsers open about six connections per host, which bounds how many plots one visitor fetches at once
+BROWSER_CONNECTIONS = 6
+
+
+def _free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def prepare_site(data):
+    """
+    Returns (workspace, cleanup) where workspace contains results/ and visual/ like the repo root.
+    data is 'repo' for the committed results file or a synthetic size preset name.
+    """
+    if data == 'repo':
+        return REPO_ROOT, False
+    workspace, _ = prepare_workspace(data, seed=0)
+    return workspace, True
+
+
+def plot_bursts(csv_path):
+    """
+    Returns {(dataset, horizon): [plot paths]} with the MAE/MSE plot of every
+    teacher-student pair for that dataset and horizon.
+    This is a synthetic traffic model: index.html embeds no plots, so loading / does
+    not itself request any. It approximates a visitor who opens a dataset/horizon
+    table and then views its plots. Standalone models are left out because
+    serve_plot() cannot currently find their rows (teacher 'None' becomes '' when
+    the data is processed).
+    """
+    df = pd.read_csv(csv_path, usecols=['dataset', 'horizon', 'model_combination', 'split'])
+    pairs = df[(df['split'] == 'test') & df['model_combination'].str.contains('-', regex=False)]
+    pairs = pairs[['dataset', 'horizon', 'model_combination']].drop_duplicates()
+
+    bursts = {}
+    for row in pairs.itertuples(index=False):
+        teacher, student = row.model_combination.split('-', 1)
+        parts = [urllib.parse.quote(str(p), safe='') for p in (row.dataset, row.horizon, teacher, student)]
+        for metric in ['mae', 'mse']:
+            bursts.setdefault((row.dataset, row.horizon), []).append(f"/plot/{'/'.join(parts)}/{metric}.png")
+    return bursts
+
+
+def reference_plots(csv_path, bursts):
+    """
+    Renders every plot in `bursts` once, single-threaded and in-process, the same way
+    serve_plot() does. Returns {path: sha256 of the PNG} so responses under load can be
+    checked byte for byte; a garbled plot still starts with a valid PNG header.
+    """
+    df = load_and_process_data(csv_path)
+    references = {}
+    for paths in bursts.values():
+        for path in paths:
+            dataset, horizon, teacher, student_arch, metric_file = [
+                urllib.parse.unquote(p) for p in path[len('/plot/'):].split('/')]
+            metric = metric_file[:-len('.png')]
+            target = {'dataset': dataset, 'horizon': horizon, 'teacher': teacher,
+                      'student_arch': student_arch, 'metric': metric}
+            img_bytes = generate_plot_to_bytes(
+                metric_group=plot_group(df, target), dataset=dataset, horizon=horizon,
+                teacher=teacher, student_arch=student_arch, metric=metric,
+                training_method_order=TRAINING_METHOD_ORDER)
+            references[path] = hashlib.sha256(img_bytes.getvalue()).hexdigest()
+    return references
+
+
+class GunicornServer:
+    """Starts gunicorn on a free local port and samples the RSS of its worker processes."""
+
+    def __init__(self, workspace, workers, worker_class, threads, timeout=120):
+        self.workspace = workspace
+        self.workers = workers
+        self.worker_class = worker_class
+        self.threads = threads
+        self.timeout = timeout
+        self.port = _free_port()
+        self.proc = None
+        self.peak_rss_mb = {}
+        self._sampling = False
+        self._sampler = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, ready_timeout=60):
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''),
+                   MPLBACKEND='Agg')
+        cmd = [sys.executable, '-m', 'gunicorn',
+               '--bind', f'127.0.0.1:{self.port}',
+               '--workers', str(self.workers),
+               '--worker-class', self.worker_class,
+               '--threads', str(self.threads),
+               '--timeout', str(self.timeout),
+               'visual.app:app']
+        self.proc = subprocess.Popen(cmd, cwd=self.workspace, env=env,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + ready_timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"gunicorn exited early with code {self.proc.returncode}")
+            # Wait until every worker has booted, not just until the port accepts connections
+            if len(self._worker_pids()) >= self.workers and self._port_open():
+                return
+            time.sleep(0.2)
+        self.stop()
+        raise RuntimeError('gunicorn did not become ready in time')
+
+    def _port_open(self):
+        try:
+            with socket.create_connection(('127.0.0.1', self.port), timeout=0.5):
+                return True
+        except OSError:
+            return False
+
+    def _worker_pids(self):
+        """Children of the gunicorn master, read from /proc (Linux only)."""
+        if not os.path.isdir('/proc'):
+            return []
+        pids = []
+        for entry in os.listdir('/proc'):
+            if not entry.isdigit():
+                continue
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    # The command name may contain spaces, so split after its closing parenthesis
+                    fields = f.read().rsplit(')', 1)[1].split()
+            except OSError:
+                continue
+            if int(fields[1]) == self.proc.pid:
+                pids.append(int(entry))
+        return pids
+
+    @staticmethod
+    def _rss_mb(pid):
+        try:
+            with open(f'/proc/{pid}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        return int(line.split()[1]) / 1024
+        except OSError:
+            pass
+        return None
+
+    def _sample_loop(self, interval):
+        while self._sampling:
+            for pid in [self.proc.pid] + self._worker_pids():
+                rss = self._rss_mb(pid)
+                if rss is not None:
+                    self.peak_rss_mb[pid] = max(rss, self.peak_rss_mb.get(pid, 0.0))
+            time.sleep(interval)
+
+    def start_sampling(self, interval=0.25):
+        self.peak_rss_mb = {}
+        self._sampling = True
+        self._sampler = threading.Thread(target=self._sample_loop, args=(interval,), daemon=True)
+        self._sampler.start()
+
+    def stop_sampling(self):
+        self._sampling = False
+        if self._sampler is not None:
+            self._sampler.join()
+        master = self.peak_rss_mb.pop(self.proc.pid, None)
+        return master, sorted(self.peak_rss_mb.values(), reverse=True)
+
+    def stop(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+
+def _fetch(base_url, path, timeout, expected_sha256=None):
+    """
+    Returns (kind, seconds, ok, finished_at) for one GET request, finished_at being a
+    time.monotonic() timestamp. When expected_sha256 is given the body must match it
+    exactly; the summary page embeds random table ids, so it is only checked for status.
+    """
+    start = time.perf_counter()
+    ok = False
+    try:
+        with urllib.request.urlopen(base_url + path, timeout=timeout) as response:
+            body = response.read()
+            ok = response.status == 200 and (
+                expected_sha256 is None or hashlib.sha256(body).hexdigest() == expected_sha256)
+    except (urllib.error.URLError, OSError):
+        pass
+    return ('page' if path == '/' else 'plot', time.perf_counter() - start, ok, time.monotonic())
+
+
+def run_load(base_url, bursts, references, users, duration, seed=0, timeout=120):
+    """
+    Runs simulated sessions from `users` concurrent clients for `duration` seconds.
+    A session is one GET / followed by the synthetic plot burst of one dataset/horizon
+    (see plot_bursts), fetched over BROWSER_CONNECTIONS parallel connections.
+    No request is started after the deadline; requests already in flight are allowed
+    to finish. Returns (records, sessions, deadline), where sessions holds the durations
+    of the sessions that completed within the window.
+    """
+    records = []
+    sessions = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+    tabs = sorted(bursts)
+
+    def fetch(path):
+        if time.monotonic() >= deadline:
+            return None
+        return _fetch(base_url, path, timeout, references.get(path))
+
+    def user(user_id):
+        rng = random.Random(seed + user_id)
+        with ThreadPoolExecutor(max_workers=BROWSER_CONNECTIONS) as browser:
+            while time.monotonic() < deadline:
+                session_start = time.perf_counter()
+                page = fetch('/')
+                plots = list(browser.map(fetch, bursts[rng.choice(tabs)]))
+                issued = [r for r in [page] + plots if r is not None]
+                complete = len(issued) == 1 + len(plots) and all(r[3] <= deadline for r in issued)
+                with lock:
+                    records.extend(issued)
+                    if complete:
+                        sessions.append(time.perf_counter() - session_start)
+
+    threads = [threading.Thread(target=user, args=(i,)) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return records, sessions, deadline
+
+
+def _percentile(values, q):
+    """Nearest-rank percentile; values need not be sorted."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+
+def summarise(records, sessions, duration, deadline):
+    """
+    Throughput only counts requests that finished inside the measured window, so the
+    drain of in-flight requests after the deadline does not dilute it. Latency and
+    error figures use every request that was started.
+    """
+    in_window = [r for r in records if r[3] <= deadline]
+    summary = {'window_s': duration, 'requests': len(records), 'requests_in_window': len(in_window),
+               'sessions': len(sessions), 'errors': sum(1 for r in records if not r[2])}
+    summary['error_rate'] = summary['errors'] / len(records) if records else 0.0
+    summary['throughput_rps'] = len(in_window) / duration if duration > 0 else 0.0
+    summary['sessions_per_s'] = len(sessions) / duration if duration > 0 else 0.0
+    for kind in ['all', 'page', 'plot']:
+        latencies = [r[1] for r in records if kind == 'all' or r[0] == kind]
+        summary[kind] = {f'p{q}_s': _percentile(latencies, q) for q in (50, 95, 99)}
+    summary['session'] = {f'p{q}_s': _percentile(sessions, q) for q in (50, 95, 99)}
+    return summary
+
+
+def run_config(workspace, bursts, references, workers, worker_class, threads, users, duration, warmup):
+    """Starts gunicorn with one configuration, warms it up, loads it and returns the summary."""
+    server = GunicornServer(workspace, workers, worker_class, threads)
+    server.start()
+    try:
+        # Without concurrency the server must reproduce the reference render exactly,
+        # otherwise every mismatch under load would be a harness problem, not a race
+        probe = next(iter(references))
+        if not _fetch(server.base_url, probe, 120, references[probe])[2]:
+            raise RuntimeError(f"Single-threaded fetch of {probe} does not match the reference render")
+        if warmup > 0:
+            run_load(server.base_url, bursts, references, users, warmup)
+        server.start_sampling()
+        records, sessions, deadline = run_load(server.base_url, bursts, references, users, duration)
+        master_rss, worker_rss = server.stop_sampling()
+    finally:
+        server.stop()
+    summary = summarise(records, sessions, duration, deadline)
+    summary.update({'workers': workers, 'worker_class': worker_class, 'threads': threads,
+                    'users': users, 'master_rss_mb': master_rss, 'worker_rss_mb': worker_rss})
+    return summary
+
+
+def recommend(results, p95_target_s, memory_limit_mb, max_error_rate=0.0, min_requests=50, min_sessions=5):
+    """
+    Picks the configuration to deploy: among error-free runs that fit in memory,
+    the highest throughput whose p95 latency meets the target, preferring fewer
+    workers on near-ties. Runs with too few samples for stable percentiles are not
+    considered. Returns (result, list of explanatory notes).
+    """
+    notes = []
+    sampled = []
+    for r in results:
+        if r['requests_in_window'] < min_requests or r['sessions'] < min_sessions:
+            notes.append(f"{_label(r)} rejected: only {r['requests_in_window']} requests and "
+                         f"{r['sessions']} complete sessions in the measured window (need "
+                         f"{min_requests} and {min_sessions}); increase --duration or --users.")
+        else:
+            sampled.append(r)
+    candidates = [r for r in sampled if r['error_rate'] <= max_error_rate]
+    rejected = [r for r in sampled if r not in candidates]
+    for r in rejected:
+        notes.append(f"{_label(r)} rejected: {r['error_rate']:.1%} of requests failed or returned a plot "
+                     f"that differs from the single-threaded reference.")
+
+    if memory_limit_mb:
+        fits = []
+        for r in candidates:
+            needed = _memory_needed(r)
+            if needed is None or needed <= memory_limit_mb:
+                fits.append(r)
+            else:
+                notes.append(f"{_label(r)} rejected: needs ~{needed:.0f} MB, limit is {memory_limit_mb:.0f} MB.")
+        candidates = fits
+
+    if not candidates:
+        return None, notes + ['No configuration passed; see the reasons above.']
+
+    meeting = [r for r in candidates if r['all']['p95_s'] is not None and r['all']['p95_s'] <= p95_target_s]
+    if meeting:
+        best_rps = max(r['throughput_rps'] for r in meeting)
+        # Within 5% of the best throughput, fewer worker processes wins (less memory, same speed)
+        near_best = [r for r in meeting if r['throughput_rps'] >= 0.95 * best_rps]
+        choice = min(near_best, key=lambda r: (r['workers'], -r['throughput_rps']))
+    else:
+        choice = min(candidates, key=lambda r: r['all']['p95_s'])
+        notes.append(f"No configuration met the p95 target of {p95_target_s:.2f}s; "
+                     f"picked the lowest p95. The app is CPU-bound per request, so add CPUs or cache results.")
+
+    worker_rss = max(choice['worker_rss_mb']) if choice['worker_rss_mb'] else None
+    if memory_limit_mb and worker_rss:
+        headroom = int((memory_limit_mb - (choice['master_rss_mb'] or 0)) // worker_rss)
+        notes.append(f"At ~{worker_rss:.0f} MB per worker, {memory_limit_mb:.0f} MB fits at most {headroom} workers.")
+    if choice['worker_class'] == 'gthread':
+        notes.append("Plot rendering is serialised per process (pyplot is not thread-safe), "
+                     "so gthread threads only overlap data loading, table styling and I/O.")
+    notes.append(f"CPUs on this machine: {os.cpu_count()}. Sync workers beyond the CPU count rarely help "
+                 f"because every request renders tables or plots in Python.")
+    return choice, notes
+
+
+def _memory_needed(result):
+    if not result['worker_rss_mb']:
+        return None
+    return (result['master_rss_mb'] or 0) + max(result['worker_rss_mb']) * result['workers']
+
+
+def _label(result):
+    label = f"{result['workers']}x{result['worker_class']}"
+    if result['worker_class'] == 'gthread':
+        label += f"/{result['threads']}t"
+    return label
+
+
+def print_results(results):
+    header = (f"{'config':<14} {'reqs':>5} {'sess':>5} {'req/s':>7} {'sess/s':>7} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} "
+              f"{'page p95':>9} {'plot p95':>9} {'errors':>7} {'worker RSS (MB)':>16}")
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        rss = f"{max(r['worker_rss_mb']):.0f}" if r['worker_rss_mb'] else 'n/a'
+        fmt = lambda v: f"{v:.3f}" if v is not None else 'n/a'
+        print(f"{_label(r):<14} {r['requests_in_window']:>5} {r['sessions']:>5} {r['throughput_rps']:>7.2f} {r['sessions_per_s']:>7.2f} "
+              f"{fmt(r['all']['p50_s']):>8} {fmt(r['all']['p95_s']):>8} {fmt(r['all']['p99_s']):>8} "
+              f"{fmt(r['page']['p95_s']):>9} {fmt(r['plot']['p95_s']):>9} {r['errors']:>7} {rss:>16}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the Flask app under a local gunicorn and suggest a worker configuration.')
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='Worker counts to try')
+    parser.add_argument('--worker-class', nargs='+', choices=['sync', 'gthread'], default=['sync', 'gthread'])
+    parser.add_argument('--threads', type=int, default=4, help='Threads per gthread worker')
+    parser.add_argument('--users', type=int, default=4, help='Concurrent simulated visitors')
+    parser.add_argument('--duration', type=float, default=30.0,
+                        help='Seconds of measured load per configuration; no request starts after it ends')
+    parser.add_argument('--warmup', type=float, default=5.0, help='Seconds of unmeasured load before each run')
+    parser.add_argument('--data', choices=['repo'] + list(SIZE_PRESETS), default='repo',
+                        help="'repo' uses results/collected_partial_summary.csv, otherwise a synthetic preset")
+    parser.add_argument('--p95-target', type=float, default=2.0, help='Acceptable p95 latency in seconds')
+    parser.add_argument('--memory-limit', type=float, default=2048.0,
+                        help='Container memory in MB (Cloud Run default is 512)')
+    parser.add_argument('--min-requests', type=int, default=50,
+                        help='Minimum requests finished in the window for a configuration to be recommended')
+    parser.add_argument('--min-sessions', type=int, default=5,
+                        help='Minimum complete sessions in the window for a configuration to be recommended')
+    parser.add_argument('--output', help='Optional path for a JSON report')
+    args = parser.parse_args(argv)
+
+    workspace, cleanup = prepare_site(args.data)
+    try:
+        bursts = plot_bursts(os.path.join(workspace, CSV_RELATIVE_PATH))
+        if not bursts:
+            print('No teacher-student pairs found in the data; nothing to load-test.')
+            return 1
+        print(f"Rendering {sum(len(p) for p in bursts.values())} reference plots single-threaded...", flush=True)
+        references = reference_plots(os.path.join(workspace, CSV_RELATIVE_PATH), bursts)
+
+        results = []
+        for worker_class in args.worker_class:
+            threads = args.threads if worker_class == 'gthread' else 1
+            for workers in args.workers:
+                print(f"Running {workers} {worker_class} worker(s), {threads} thread(s), "
+                      f"{args.users} users for {args.duration:.0f}s...", flush=True)
+                results.append(run_config(workspace, bursts, references, workers, worker_class, threads,
+                                          args.users, args.duration, args.warmup))
+    finally:
+        if cleanup:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    print()
+    print_results(results)
+    choice, notes = recommend(results, args.p95_target, args.memory_limit,
+                              min_requests=args.min_requests, min_sessions=args.min_sessions)
+    print()
+    for note in notes:
+        print(f"- {note}")
+    if choice is not None:
+        print(f"\nRecommended: {_label(choice)} "
+              f"({choice['throughput_rps']:.2f} req/s, p95 {choice['all']['p95_s']:.3f}s)")
+        print(f"  GUNICORN_WORKERS={choice['workers']} GUNICORN_WORKER_CLASS={choice['worker_class']} "
+              f"GUNICORN_THREADS={choice['threads']}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'results': results, 'recommendation': choice, 'notes': notes}, f, indent=2)
+        print(f"Wrote load-test report to {args.output}")
+    return 0 if choice is not None else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,267 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import pandas as pd
+import numpy as np
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from benchmarks.common import TRAINING_METHOD_ORDER, prepare_workspace, plot_group
+from benchmarks.synthetic_data import SIZE_PRESETS, expected_row_count, build_config
+from visual.data_processor import parse_model_details, load_and_process_data, compute_generalization_gap
+from visual.app import app, build_summary_pivot, render_summary_tables
+from visual.plotter import generate_plot_to_bytes
+
+# Stage order follows the pipeline: load -> parse -> pivot -> style -> plot, then end-to-end
+ALL_STAGES = ['load', 'parse', 'process', 'pivot', 'style', 'plot', 'gap',
+              'index', 'serve_plot', 'generate_static']
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO_ROOT,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _test_filter(df):
+    """Same row selection index() applies before pivoting."""
+    return df[
+        (df['split'] == 'test') &
+        (df['metric'].isin(['mae', 'mse'])) &
+        (df['student_model_arch'] != '') &
+        (df['student_model_arch'].notna())
+    ].copy()
+
+
+def _plot_target(processed_df):
+    """Picks one teacher-student group that serve_plot() can render."""
+    candidates = processed_df[
+        (processed_df['split'] == 'test') &
+        (processed_df['metric'] == 'mae') &
+        (processed_df['training_method'] == 'RDT') &
+        (processed_df['teacher_model'] != '')
+    ]
+    row = candidates.iloc[0]
+    return {
+        'dataset': row['dataset'],
+        'horizon': row['horizon'],
+        'teacher': row['teacher_model'],
+        'student_arch': row['student_model_arch'],
+        'metric': 'mae',
+    }
+
+
+class _InWorkspace:
+    """Temporarily switches the working directory, since the app reads a relative CSV path."""
+
+    def __init__(self, workspace):
+        self.workspace = workspace
+        self.previous = None
+
+    def __enter__(self):
+        self.previous = os.getcwd()
+        os.chdir(self.workspace)
+
+    def __exit__(self, *exc):
+        os.chdir(self.previous)
+
+
+def build_stages(workspace, csv_path):
+    """
+    Returns {stage_name: (setup, run)}. setup() prepares untimed inputs and
+    run(inputs) is the timed call. Inputs for later stages are derived lazily.
+    """
+    cache = {}
+
+    def raw_df():
+        if 'raw' not in cache:
+            cache['raw'] = pd.read_csv(csv_path)
+        return cache['raw']
+
+    def processed_df():
+        if 'processed' not in cache:
+            cache['processed'] = load_and_process_data(csv_path)
+        return cache['processed']
+
+    def pivot():
+        if 'pivot' not in cache:
+            cache['pivot'] = build_summary_pivot(_test_filter(processed_df()), TRAINING_METHOD_ORDER)
+        return cache['pivot']
+
+    def plot_target():
+        if 'target' not in cache:
+            cache['target'] = _plot_target(processed_df())
+        return cache['target']
+
+    client = app.test_client()
+
+    def plot_url():
+        t = plot_target()
+        return f"/plot/{t['dataset']}/{t['horizon']}/{t['teacher']}/{t['student_arch']}/{t['metric']}.png"
+
+    def get_ok(url):
+        with _InWorkspace(workspace):
+            response = client.get(url)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+        return response.data
+
+    def run_plot(group):
+        t = plot_target()
+        return generate_plot_to_bytes(metric_group=group, dataset=t['dataset'], horizon=t['horizon'],
+                                      teacher=t['teacher'], student_arch=t['student_arch'],
+                                      metric=t['metric'], training_method_order=TRAINING_METHOD_ORDER)
+
+    return {
+        'load': (lambda: None, lambda _: pd.read_csv(csv_path)),
+        'parse': (lambda: raw_df().copy(), parse_model_details),
+        'process': (lambda: None, lambda _: load_and_process_data(csv_path)),
+        'pivot': (lambda: _test_filter(processed_df()),
+                  lambda df: build_summary_pivot(df, TRAINING_METHOD_ORDER)),
+        'style': (pivot, lambda p: render_summary_tables(p, TRAINING_METHOD_ORDER)),
+        'plot': (lambda: plot_group(processed_df(), plot_target()), run_plot),
+        'gap': (processed_df, lambda df: compute_generalization_gap(df, TRAINING_METHOD_ORDER)),
+        'index': (lambda: None, lambda _: get_ok('/')),
+        'serve_plot': (plot_url, get_ok),
+    }
+
+
+def _run_generate_static(workspace):
+    """Runs generate_static.py in the workspace; returns (seconds, peak RSS in MB)."""
+    env = dict(os.environ, PYTHONPATH=REPO_ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    with tempfile.TemporaryFile() as stderr_file:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, os.path.join(REPO_ROOT, 'generate_static.py')],
+                                cwd=workspace, env=env, stdout=subprocess.DEVNULL, stderr=stderr_file)
+        # wait4 gives the resource usage of this child alone, unlike RUSAGE_CHILDREN
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        if proc.returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors='replace')
+            raise RuntimeError(f"generate_static.py failed ({proc.returncode}): {stderr.strip()[-500:]}")
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return elapsed, usage.ru_maxrss / scale
+
+
+def _summarise(times, peak_mem_mb, mem_method):
+    return {
+        'times_s': times,
+        'min_s': min(times),
+        'median_s': statistics.median(times),
+        'mean_s': statistics.fmean(times),
+        'peak_mem_mb': peak_mem_mb,
+        'mem_method': mem_method,
+    }
+
+
+def time_stage(setup, run, repeat):
+    """
+    Times run(setup()) `repeat` times, then does one extra traced call for peak memory.
+    Memory is measured separately because tracemalloc slows allocation-heavy code.
+    """
+    times = []
+    for _ in range(repeat):
+        inputs = setup()
+        start = time.perf_counter()
+        run(inputs)
+        times.append(time.perf_counter() - start)
+
+    inputs = setup()
+    tracemalloc.start()
+    try:
+        run(inputs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return _summarise(times, peak / (1024 * 1024), 'tracemalloc')
+
+
+def run_size(size, stages, repeat, seed, data_dir=None):
+    """Benchmarks the requested stages against one synthetic dataset size."""
+    n_rows = expected_row_count(build_config(**SIZE_PRESETS[size]))
+    print(f"[{size}] generating synthetic data ({n_rows} rows)...")
+    start = time.perf_counter()
+    workspace, csv_path = prepare_workspace(size, seed, data_dir)
+    generate_s = time.perf_counter() - start
+
+    stage_funcs = build_stages(workspace, csv_path)
+    results = []
+    try:
+        for stage in stages:
+            print(f"[{size}] {stage}...", end=' ', flush=True)
+            try:
+                if stage == 'generate_static':
+                    runs = [_run_generate_static(workspace) for _ in range(repeat)]
+                    summary = _summarise([t for t, _ in runs], max(m for _, m in runs), 'ru_maxrss')
+                else:
+                    setup, run = stage_funcs[stage]
+                    summary = time_stage(setup, run, repeat)
+            except Exception as e:
+                print(f"failed: {e}")
+                results.append({'size': size, 'rows': n_rows, 'stage': stage, 'error': str(e)})
+                continue
+            print(f"median {summary['median_s']:.4f}s, peak {summary['peak_mem_mb']:.1f} MB")
+            results.append({'size': size, 'rows': n_rows, 'stage': stage, **summary})
+    finally:
+        # Symlinks (visual/, a cached CSV) are removed without touching their targets
+        shutil.rmtree(workspace, ignore_errors=True)
+    return results, generate_s
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the load/parse/pivot/style/plot pipeline on synthetic data.')
+    parser.add_argument('--sizes', nargs='+', choices=list(SIZE_PRESETS), default=['tiny', 'small'])
+    parser.add_argument('--stages', nargs='+', choices=ALL_STAGES, default=ALL_STAGES)
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs per stage')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', help='Cache generated CSVs here so several commits can share them')
+    parser.add_argument('--output', default=os.path.join('benchmarks', 'output', 'results.json'))
+    args = parser.parse_args(argv)
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'generate_s': {},
+        'results': [],
+    }
+    for size in args.sizes:
+        results, generate_s = run_size(size, args.stages, args.repeat, args.seed, args.data_dir)
+        report['generate_s'][size] = generate_s
+        report['results'].extend(results)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote benchmark results to {args.output}")
+    return 1 if any('error' in r for r in report['results']) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
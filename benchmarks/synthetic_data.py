@@ -0,0 +1,163 @@
+import argparse
+import os
+import numpy as np
+import pandas as pd
+
+# Column layout of results/collected_partial_summary.csv
+CSV_COLUMNS = ['dataset', 'horizon', 'model_combination', 'split', 'model_type', 'metric', 'value']
+
+SPLITS = ['train', 'val', 'test']
+METRICS = ['mae', 'mse', 'mape', 'wape']
+PAIR_MODEL_TYPES = ['Teacher', 'Student_TaskOnly', 'Student_RDT', 'Student_Follower']
+
+BASE_ARCHS = ['DLinear', 'PatchTST', 'NLinear', 'LSTM']
+BASE_DATASETS = ['ETT-small_ETTh1', 'ETT-small_ETTh2', 'ETT-small_ETTm1',
+                 'ETT-small_ETTm2', 'exchange_rate', 'weather']
+BASE_HORIZONS = [24, 96, 192, 336, 720]
+
+# Presets roughly spanning the real file (~6k rows) up to tens of millions of rows
+SIZE_PRESETS = {
+    'tiny':   dict(n_datasets=2,   n_horizons=2,  n_teachers=2,  n_students=2,  n_standalone=2),
+    'small':  dict(n_datasets=6,   n_horizons=5,  n_teachers=2,  n_students=2,  n_standalone=4),
+    'medium': dict(n_datasets=12,  n_horizons=6,  n_teachers=6,  n_students=6,  n_standalone=6),
+    'large':  dict(n_datasets=40,  n_horizons=8,  n_teachers=12, n_students=12, n_standalone=8),
+    'xlarge': dict(n_datasets=100, n_horizons=10, n_teachers=25, n_students=25, n_standalone=10),
+}
+
+# Multiplicative effects used to give the synthetic values a plausible shape
+_SPLIT_FACTOR = {'train': 0.85, 'val': 0.95, 'test': 1.0}
+_MODEL_TYPE_FACTOR = {'Teacher': 1.0, 'Student_TaskOnly': 1.05, 'Student_RDT': 0.97,
+                      'Student_Follower': 1.02}
+_METRIC_SCALE = {'mae': 1.0, 'mse': 1.0, 'mape': 50.0, 'wape': 20.0}
+
+
+def _names(base, n, prefix):
+    """Returns n names, using the real ones first and numbered placeholders after."""
+    names = list(base[:n])
+    names.extend(f"{prefix}{i:03d}" for i in range(len(names), n))
+    return names
+
+
+def _horizons(n):
+    horizons = list(BASE_HORIZONS[:n])
+    while len(horizons) < n:
+        horizons.append(horizons[-1] * 2)
+    return horizons
+
+
+def build_config(n_datasets, n_horizons, n_teachers, n_students, n_standalone):
+    """
+    Builds the dimension lists for a synthetic results file.
+    Model names never contain '-', since parse_model_details splits pairs on it.
+    """
+    return {
+        'datasets': _names(BASE_DATASETS, n_datasets, 'dataset_'),
+        'horizons': _horizons(n_horizons),
+        'teachers': _names(BASE_ARCHS, n_teachers, 'Arch'),
+        'students': _names(BASE_ARCHS, n_students, 'Arch'),
+        'standalone': _names(BASE_ARCHS, n_standalone, 'Arch'),
+    }
+
+
+def _model_rows(config):
+    """Returns (model_combination, model_type) for every model evaluated per dataset/horizon."""
+    combos, types = [], []
+    for teacher in config['teachers']:
+        for student in config['students']:
+            for model_type in PAIR_MODEL_TYPES:
+                combos.append(f"{teacher}-{student}")
+                types.append(model_type)
+    for model in config['standalone']:
+        combos.append(model)
+        types.append(model)
+    return np.array(combos, dtype=object), np.array(types, dtype=object)
+
+
+def expected_row_count(config):
+    n_models = len(config['teachers']) * len(config['students']) * len(PAIR_MODEL_TYPES) + len(config['standalone'])
+    return len(config['datasets']) * len(config['horizons']) * n_models * len(SPLITS) * len(METRICS)
+
+
+def _dataset_chunk(dataset, config, combos, types, rng):
+    """Builds all rows for one dataset as a DataFrame."""
+    horizons = np.array(config['horizons'])
+    n_h, n_m, n_s, n_metric = len(horizons), len(combos), len(SPLITS), len(METRICS)
+    n_rows = n_h * n_m * n_s * n_metric
+
+    # Row order is horizon > model > split > metric, matching the real file
+    horizon_col = np.repeat(horizons, n_m * n_s * n_metric)
+    combo_col = np.tile(np.repeat(combos, n_s * n_metric), n_h)
+    type_col = np.tile(np.repeat(types, n_s * n_metric), n_h)
+    split_col = np.tile(np.repeat(np.array(SPLITS, dtype=object), n_metric), n_h * n_m)
+    metric_col = np.tile(np.array(METRICS, dtype=object), n_h * n_m * n_s)
+
+    # One base error per (horizon, model); the metric-specific values are derived from it
+    base = rng.uniform(0.2, 3.0, size=n_h * n_m) * (1.0 + np.log2(horizons / horizons[0] + 1.0) * 0.1).repeat(n_m)
+    base = np.repeat(base, n_s * n_metric)
+    split_factor = np.array([_SPLIT_FACTOR[s] for s in SPLITS]).repeat(n_metric)
+    split_factor = np.tile(split_factor, n_h * n_m)
+    type_factor = pd.Series(type_col).map(_MODEL_TYPE_FACTOR).fillna(1.0).to_numpy()
+    metric_scale = np.tile(np.array([_METRIC_SCALE[m] for m in METRICS]), n_h * n_m * n_s)
+
+    value = base * split_factor * type_factor * rng.normal(1.0, 0.03, size=n_rows)
+    value = np.where(metric_col == 'mse', value ** 2, value * metric_scale)
+
+    return pd.DataFrame({
+        'dataset': dataset,
+        'horizon': horizon_col,
+        'model_combination': combo_col,
+        'split': split_col,
+        'model_type': type_col,
+        'metric': metric_col,
+        'value': value,
+    }, columns=CSV_COLUMNS)
+
+
+def generate_results_csv(csv_path, n_datasets=6, n_horizons=5, n_teachers=2, n_students=2,
+                         n_standalone=4, seed=0):
+    """
+    Writes a synthetic results CSV with the collected_partial_summary.csv schema.
+    Rows are written one dataset at a time so memory stays bounded for very large files.
+    Returns the number of rows written.
+    """
+    config = build_config(n_datasets, n_horizons, n_teachers, n_students, n_standalone)
+    combos, types = _model_rows(config)
+    rng = np.random.default_rng(seed)
+
+    os.makedirs(os.path.dirname(os.path.abspath(csv_path)), exist_ok=True)
+    rows_written = 0
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        for i, dataset in enumerate(config['datasets']):
+            chunk = _dataset_chunk(dataset, config, combos, types, rng)
+            chunk.to_csv(f, header=(i == 0), index=False, float_format='%.6f')
+            rows_written += len(chunk)
+    return rows_written
+
+
+def generate_preset(csv_path, size, seed=0):
+    """Writes the synthetic file for a named preset (see SIZE_PRESETS)."""
+    return generate_results_csv(csv_path, seed=seed, **SIZE_PRESETS[size])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic results CSV for benchmarking.')
+    parser.add_argument('output', help='Path of the CSV file to write')
+    parser.add_argument('--size', choices=sorted(SIZE_PRESETS), default='small')
+    parser.add_argument('--datasets', type=int, help='Override the number of datasets')
+    parser.add_argument('--horizons', type=int, help='Override the number of horizons')
+    parser.add_argument('--teachers', type=int, help='Override the number of teacher architectures')
+    parser.add_argument('--students', type=int, help='Override the number of student architectures')
+    parser.add_argument('--standalone', type=int, help='Override the number of standalone (Direct) models')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    params = dict(SIZE_PRESETS[args.size])
+    for key, override in [('n_datasets', args.datasets), ('n_horizons', args.horizons),
+                          ('n_teachers', args.teachers), ('n_students', args.students),
+                          ('n_standalone', args.standalone)]:
+        if override is not None:
+            params[key] = override
+
+    print(f"Expected rows: {expected_row_count(build_config(**params))}")
+    n_rows = generate_results_csv(args.output, seed=args.seed, **params)
+    print(f"Wrote {n_rows} rows to {args.output}")
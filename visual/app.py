@@ -3,8 +3,9 @@ import os
 import pandas as pd
 import numpy as np
 import io
-from visual.data_processor import load_and_process_data
-from visual.plotter import generate_plot_to_bytes # Import the new function
+import threading
+from visual.data_processor import load_and_process_data, compute_generalization_gap
+from visual.plotter import generate_plot_to_bytes, generate_generalization_plot_to_bytes
 
 app = Flask(__name__, template_folder='templates', static_folder='static')
 # PLOTS_DIR and its creation are no longer needed here as plots are dynamic
@@ -65,6 +66,70 @@ def style_metric_specific_top_three(df_group, performance_cols, metric_col_name=
     return style_df
 
 
+SUMMARY_ID_VARS = ['dataset', 'horizon', 'teacher_model', 'student_model_arch', 'metric']
+
+def build_summary_pivot(test_df_for_tables, training_method_order):
+    """
+    Pivots the filtered test rows into one column per training method
+    and adds the RDT_vs_TaskOnly comparison column.
+    """
+    id_vars = SUMMARY_ID_VARS
+    pivot_table = test_df_for_tables.pivot_table(
+        index=id_vars, columns='training_method', values='value'
+    ).reset_index()
+
+    for method in training_method_order:
+        if method not in pivot_table.columns:
+            pivot_table[method] = pd.NA
+    
+    if 'RDT' in pivot_table.columns and 'TaskOnly' in pivot_table.columns:
+        pivot_table['RDT_numeric'] = pd.to_numeric(pivot_table['RDT'], errors='coerce')
+        pivot_table['TaskOnly_numeric'] = pd.to_numeric(pivot_table['TaskOnly'], errors='coerce')
+        conditions = [
+            (pivot_table['RDT_numeric'] < pivot_table['TaskOnly_numeric']),
+            (pivot_table['RDT_numeric'] > pivot_table['TaskOnly_numeric']),
+            (pivot_table['RDT_numeric'] == pivot_table['TaskOnly_numeric'])
+        ]
+        choices = ['Better', 'Worse', 'Same']
+        pivot_table['RDT_vs_TaskOnly'] = pd.Series([pd.NA] * len(pivot_table), dtype=object)
+        mask_both_valid = pivot_table['RDT_numeric'].notna() & pivot_table['TaskOnly_numeric'].notna()
+        select_results = np.full(mask_both_valid.sum(), pd.NA, dtype=object)
+        if mask_both_valid.sum() > 0:
+            valid_conditions = [cond[mask_both_valid].to_numpy() for cond in conditions]
+            select_results = np.select(valid_conditions, choices, default=pd.NA)
+        pivot_table.loc[mask_both_valid, 'RDT_vs_TaskOnly'] = select_results
+        pivot_table.drop(columns=['RDT_numeric', 'TaskOnly_numeric'], inplace=True)
+    else:
+        pivot_table['RDT_vs_TaskOnly'] = 'N/A'
+
+    display_columns = id_vars + [col for col in training_method_order if col in pivot_table.columns] + ['RDT_vs_TaskOnly']
+    return pivot_table[display_columns]
+
+def render_summary_tables(pivot_table, training_method_order):
+    """
+    Renders one styled HTML table per (dataset, horizon) group of the summary pivot.
+    Returns a dict mapping the group label to its HTML.
+    """
+    summary_tables_html = {}
+    for (dataset_val, horizon_val), group_df in pivot_table.groupby(['dataset', 'horizon']):
+        group_key = f"{dataset_val} (H={horizon_val})"
+        df_to_style = group_df.drop(columns=['dataset', 'horizon']).copy()
+        performance_cols_in_group = [col for col in training_method_order if col in df_to_style.columns]
+        
+        styled_df = df_to_style.style.apply(
+            style_metric_specific_top_three,
+            performance_cols=performance_cols_in_group,
+            metric_col_name='metric',
+            axis=None
+        ).format(
+            {col: "{:.4f}" for col in performance_cols_in_group}, na_rep=''
+        ).set_table_attributes(
+            'class="table table-striped table-hover table-sm table-responsive-sm"'
+        ).hide(axis="index").to_html()
+        summary_tables_html[group_key] = styled_df
+    return summary_tables_html
+
+
 @app.route('/')
 def index():
     csv_path = 'results/collected_partial_summary.csv'
@@ -88,7 +153,7 @@ def index():
 
             # This check remains valid
             if not test_df_for_tables.empty:
-                id_vars = ['dataset', 'horizon', 'teacher_model', 'student_model_arch', 'metric']
+                id_vars = SUMMARY_ID_VARS
                 value_vars = 'value'
                 column_vars = 'training_method'
                 
@@ -97,54 +162,9 @@ def index():
                     summary_tables_html = {"Error": "<div class='alert alert-danger'>Could not generate summary tables due to missing columns for pivot.</div>"}
                 else:
                     try:
-                        pivot_table = test_df_for_tables.pivot_table(
-                            index=id_vars, columns=column_vars, values=value_vars
-                        ).reset_index()
-
-                        for method in training_method_order:
-                            if method not in pivot_table.columns:
-                                pivot_table[method] = pd.NA
-                        
-                        if 'RDT' in pivot_table.columns and 'TaskOnly' in pivot_table.columns:
-                            pivot_table['RDT_numeric'] = pd.to_numeric(pivot_table['RDT'], errors='coerce')
-                            pivot_table['TaskOnly_numeric'] = pd.to_numeric(pivot_table['TaskOnly'], errors='coerce')
-                            conditions = [
-                                (pivot_table['RDT_numeric'] < pivot_table['TaskOnly_numeric']),
-                                (pivot_table['RDT_numeric'] > pivot_table['TaskOnly_numeric']),
-                                (pivot_table['RDT_numeric'] == pivot_table['TaskOnly_numeric'])
-                            ]
-                            choices = ['Better', 'Worse', 'Same']
-                            pivot_table['RDT_vs_TaskOnly'] = pd.Series([pd.NA] * len(pivot_table), dtype=object)
-                            mask_both_valid = pivot_table['RDT_numeric'].notna() & pivot_table['TaskOnly_numeric'].notna()
-                            select_results = np.full(mask_both_valid.sum(), pd.NA, dtype=object)
-                            if mask_both_valid.sum() > 0:
-                                valid_conditions = [cond[mask_both_valid].to_numpy() for cond in conditions]
-                                select_results = np.select(valid_conditions, choices, default=pd.NA)
-                            pivot_table.loc[mask_both_valid, 'RDT_vs_TaskOnly'] = select_results
-                            pivot_table.drop(columns=['RDT_numeric', 'TaskOnly_numeric'], inplace=True)
-                        else:
-                            pivot_table['RDT_vs_TaskOnly'] = 'N/A'
-
-                        display_columns = id_vars + [col for col in training_method_order if col in pivot_table.columns] + ['RDT_vs_TaskOnly']
-                        pivot_table = pivot_table[display_columns]
-
-                        for (dataset_val, horizon_val), group_df in pivot_table.groupby(['dataset', 'horizon']):
-                            group_key = f"{dataset_val} (H={horizon_val})"
-                            df_to_style = group_df.drop(columns=['dataset', 'horizon']).copy()
-                            performance_cols_in_group = [col for col in training_method_order if col in df_to_style.columns]
-                            
-                            styled_df = df_to_style.style.apply(
-                                style_metric_specific_top_three,
-                                performance_cols=performance_cols_in_group,
-                                metric_col_name='metric',
-                                axis=None
-                            ).format(
-                                {col: "{:.4f}" for col in performance_cols_in_group}, na_rep=''
-                            ).set_table_attributes(
-                                'class="table table-striped table-hover table-sm table-responsive-sm"'
-                            ).hide(axis="index").to_html()
-                            summary_tables_html[group_key] = styled_df
-                            
+                        pivot_table = build_summary_pivot(test_df_for_tables, training_method_order)
+                        summary_tables_html = render_summary_tables(pivot_table, training_method_order)
+
                     except Exception as e:
                         print(f"Error creating pivot table or styling it: {e}")
                         summary_tables_html = {"Error": f"<div class='alert alert-danger'>Could not generate summary tables: {e}</div>"}
@@ -226,6 +246,112 @@ def serve_plot(dataset, horizon, teacher_model_url, student_arch, metric):
         # Optionally return a placeholder error image
         return "Error generating plot", 500
 
+@app.context_processor
+def inject_nav_links():
+    # Only the Flask app serves /generalization; generate_static.py renders base.html
+    # with its own app and does not produce that page, so the link stays hidden there.
+    return {'show_generalization_link': True}
+
+# Generalization-gap results, computed once per version of the CSV and reused by every request.
+# Maps csv_path -> (data_version, analysis dict); the lock keeps threaded workers from computing twice.
+_generalization_cache = {}
+_generalization_lock = threading.Lock()
+
+def _data_version(csv_path):
+    """Identifies a version of the results file by its modification time and size."""
+    try:
+        stat = os.stat(csv_path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def build_generalization_analysis(df, training_method_order):
+    """
+    Computes the generalization-gap tables and chart from the processed frame.
+    Everything the page needs is rendered here so requests only serve cached output.
+    """
+    runs, summary = compute_generalization_gap(df, training_method_order)
+    if runs.empty:
+        return None
+
+    pct_cols = ['train_to_val_pct', 'train_to_test_pct', 'val_to_test_pct']
+    summary_html = summary[['metric', 'training_method', 'train', 'val', 'test'] + pct_cols + ['n_runs']].style.format(
+        {**{col: "{:.4f}" for col in ['train', 'val', 'test']}, **{col: "{:+.1f}%" for col in pct_cols}}, na_rep=''
+    ).set_table_attributes(
+        'class="table table-striped table-hover table-sm table-responsive-sm"'
+    ).hide(axis="index").to_html()
+
+    per_dataset = runs.pivot_table(
+        index=['dataset', 'metric'], columns='training_method', values='train_to_test_pct', aggfunc='median'
+    )
+    per_dataset = per_dataset.reindex(
+        columns=[col for col in training_method_order if col in per_dataset.columns]
+    ).reset_index()
+    per_dataset.columns.name = None
+    performance_cols = [col for col in training_method_order if col in per_dataset.columns]
+    per_dataset_html = per_dataset.style.format(
+        {col: "{:+.1f}%" for col in performance_cols}, na_rep=''
+    ).set_table_attributes(
+        'class="table table-striped table-hover table-sm table-responsive-sm"'
+    ).hide(axis="index").to_html()
+
+    chart_png = generate_generalization_plot_to_bytes(summary, training_method_order).getvalue()
+    return {
+        'summary_html': summary_html,
+        'per_dataset_html': per_dataset_html,
+        'chart_png': chart_png,
+        'n_runs': len(runs),
+    }
+
+def get_generalization_analysis(csv_path, training_method_order):
+    """Returns the cached analysis for the current version of csv_path, computing it if needed."""
+    version = _data_version(csv_path)
+    if version is None:
+        return None
+
+    cached = _generalization_cache.get(csv_path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with _generalization_lock:
+        cached = _generalization_cache.get(csv_path)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        df = load_and_process_data(csv_path)
+        analysis = build_generalization_analysis(df, training_method_order) if df is not None else None
+        _generalization_cache[csv_path] = (version, analysis)
+        return analysis
+
+@app.route('/generalization')
+def generalization():
+    csv_path = 'results/collected_partial_summary.csv'
+    training_method_order = ['Teacher', 'Direct', 'TaskOnly', 'RDT', 'Follower']
+
+    try:
+        analysis = get_generalization_analysis(csv_path, training_method_order)
+    except Exception as e:
+        print(f"Error computing generalization gap: {e}")
+        analysis = None
+
+    return render_template('generalization.html',
+                           title='Generalization Gap Analysis',
+                           analysis=analysis)
+
+@app.route('/generalization/chart.png')
+def generalization_chart():
+    csv_path = 'results/collected_partial_summary.csv'
+    training_method_order = ['Teacher', 'Direct', 'TaskOnly', 'RDT', 'Follower']
+
+    try:
+        analysis = get_generalization_analysis(csv_path, training_method_order)
+    except Exception as e:
+        print(f"Error computing generalization gap: {e}")
+        return "Error generating plot", 500
+
+    if analysis is None:
+        return "Plot data not found", 404
+    return send_file(io.BytesIO(analysis['chart_png']), mimetype='image/png')
+
 if __name__ == '__main__':
     print("Visualisation server starting...")
     print(f"Ensure Python packages are installed: pip install flask pandas matplotlib seaborn numpy")
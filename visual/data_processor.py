@@ -111,6 +111,56 @@ def load_and_process_data(csv_path='results/collected_partial_summary.csv'):
     
     return df
 
+def compute_generalization_gap(df, training_method_order, metrics=('mae', 'mse')):
+    """
+    Computes the train -> val -> test degradation of every run from the processed frame.
+    All splits are reshaped side by side in a single pivot, so each run's train, val and
+    test values sit in one row and the gaps are plain column arithmetic.
+    Returns (runs, summary): one row per run, and per training method and metric the
+    median split values and the median relative gaps (in percent). Medians keep the
+    few datasets with large error scales from dominating the levels.
+    Teacher runs are keyed without the student, since pair rows repeat the same
+    teacher run per student.
+    """
+    run_keys = ['dataset', 'horizon', 'teacher_model', 'student_model_arch', 'training_method', 'metric']
+    gap_df = df[
+        df['metric'].isin(metrics) &
+        df['training_method'].isin(training_method_order) &
+        df['split'].isin(['train', 'val', 'test'])
+    ]
+
+    # A teacher's own run is repeated in every teacher-student pair it appears in.
+    # Blanking the student for Teacher rows collapses those copies into one run
+    # (the pivot averages them), so teachers are not counted once per student.
+    gap_df = gap_df.assign(student_model_arch=gap_df['student_model_arch'].where(
+        gap_df['training_method'] != 'Teacher', ''))
+
+    runs = gap_df.pivot_table(index=run_keys, columns='split', values='value', aggfunc='mean')
+    runs = runs.reindex(columns=['train', 'val', 'test']).dropna().reset_index()
+    runs.columns.name = None
+
+    # Relative gaps are comparable across datasets whose errors differ in scale.
+    # A zero denominator gives NaN (left out of the medians) rather than inf.
+    train = runs['train'].where(runs['train'] != 0)
+    val = runs['val'].where(runs['val'] != 0)
+    runs['train_to_val_pct'] = (runs['val'] / train - 1) * 100
+    runs['train_to_test_pct'] = (runs['test'] / train - 1) * 100
+    runs['val_to_test_pct'] = (runs['test'] / val - 1) * 100
+
+    summary = runs.groupby(['training_method', 'metric'], observed=True).agg(
+        train=('train', 'median'),
+        val=('val', 'median'),
+        test=('test', 'median'),
+        train_to_val_pct=('train_to_val_pct', 'median'),
+        train_to_test_pct=('train_to_test_pct', 'median'),
+        val_to_test_pct=('val_to_test_pct', 'median'),
+        n_runs=('test', 'size'),
+    ).reset_index()
+    summary['training_method'] = pd.Categorical(summary['training_method'],
+                                                categories=training_method_order, ordered=True)
+    summary = summary.sort_values(['metric', 'training_method']).reset_index(drop=True)
+    return runs, summary
+
 if __name__ == '__main__':
     processed_df = load_and_process_data()
     if processed_df is not None:
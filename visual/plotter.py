@@ -3,6 +3,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 import io
+import threading
 from flask import send_file
 from visual.data_processor import load_and_process_data
 
@@ -10,37 +11,86 @@ from visual.data_processor import load_and_process_data
 # PLOTS_DIR = 'visual/static/images/plots'
 # os.makedirs(PLOTS_DIR, exist_ok=True)
 
+# pyplot keeps the current figure in global state, so concurrent renders (e.g. gunicorn gthread
+# workers) would draw into each other's figures. All rendering goes through this lock.
+_render_lock = threading.Lock()
+
 def generate_plot_to_bytes(metric_group, dataset, horizon, teacher, student_arch, metric, training_method_order):
     """
     Generates a single plot and returns it as a BytesIO object.
     """
-    plt.figure(figsize=(12, 7))
-    
-    sns.barplot(
-        data=metric_group,
-        x='training_method',
-        y='value',
-        palette='viridis',
-        order=training_method_order
-    )
-    
-    title_teacher_part = f"Teacher: {teacher}" if teacher != 'None' and teacher is not None else "No Explicit Teacher"
-    plot_title = (f'Comparison on {dataset} (H={horizon})\n'
-                  f'{title_teacher_part}, Student Arch: {student_arch} - Metric: {metric.upper()}')
-    
-    plt.title(plot_title, fontsize=14)
-    plt.xlabel('Training Method / Model Type', fontsize=12)
-    plt.ylabel(metric.upper() + ' Value (Lower is Better)', fontsize=12)
-    plt.xticks(rotation=45, ha='right', fontsize=10)
-    plt.yticks(fontsize=10)
-    plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.tight_layout()
-
-    img_bytes = io.BytesIO()
-    plt.savefig(img_bytes, format='png')
-    plt.close() # Close the figure to free memory
-    img_bytes.seek(0) # Reset stream position to the beginning
-    return img_bytes
+    with _render_lock:
+        plt.figure(figsize=(12, 7))
+
+        sns.barplot(
+            data=metric_group,
+            x='training_method',
+            y='value',
+            palette='viridis',
+            order=training_method_order
+        )
+
+        title_teacher_part = f"Teacher: {teacher}" if teacher != 'None' and teacher is not None else "No Explicit Teacher"
+        plot_title = (f'Comparison on {dataset} (H={horizon})\n'
+                      f'{title_teacher_part}, Student Arch: {student_arch} - Metric: {metric.upper()}')
+
+        plt.title(plot_title, fontsize=14)
+        plt.xlabel('Training Method / Model Type', fontsize=12)
+        plt.ylabel(metric.upper() + ' Value (Lower is Better)', fontsize=12)
+        plt.xticks(rotation=45, ha='right', fontsize=10)
+        plt.yticks(fontsize=10)
+        plt.grid(axis='y', linestyle='--', alpha=0.7)
+        plt.tight_layout()
+
+        img_bytes = io.BytesIO()
+        plt.savefig(img_bytes, format='png')
+        plt.close() # Close the figure to free memory
+        img_bytes.seek(0) # Reset stream position to the beginning
+        return img_bytes
+
+def generate_generalization_plot_to_bytes(summary_df, training_method_order, metrics=('mae', 'mse')):
+    """
+    Generates a compact chart of the median train->val and train->test degradation
+    per training method (one panel per metric) and returns it as a BytesIO object.
+    """
+    with _render_lock:
+        fig, axes = plt.subplots(1, len(metrics), figsize=(10, 4), sharey=False, squeeze=False)
+
+        for ax, metric in zip(axes[0], metrics):
+            metric_summary = summary_df[summary_df['metric'] == metric]
+            plot_df = metric_summary.melt(
+                id_vars='training_method',
+                value_vars=['train_to_val_pct', 'train_to_test_pct'],
+                var_name='gap',
+                value_name='pct'
+            )
+            plot_df['gap'] = plot_df['gap'].map({'train_to_val_pct': 'Train → Val', 'train_to_test_pct': 'Train → Test'})
+            if not plot_df.empty:
+                sns.barplot(
+                    data=plot_df,
+                    x='training_method',
+                    y='pct',
+                    hue='gap',
+                    palette='viridis',
+                    order=training_method_order,
+                    ax=ax
+                )
+                ax.legend(fontsize=8)
+            ax.axhline(0, color='black', linewidth=0.8)
+            ax.set_title(f'{metric.upper()}', fontsize=12)
+            ax.set_xlabel('')
+            ax.set_ylabel('Median change vs. train (%)', fontsize=10)
+            ax.tick_params(axis='x', labelrotation=30, labelsize=9)
+            ax.grid(axis='y', linestyle='--', alpha=0.7)
+
+        fig.suptitle('Generalization Gap by Training Method', fontsize=13)
+        fig.tight_layout()
+
+        img_bytes = io.BytesIO()
+        fig.savefig(img_bytes, format='png')
+        plt.close(fig) # Close the figure to free memory
+        img_bytes.seek(0)
+        return img_bytes
 
 def generate_comparison_plots(df, metrics_to_plot=['mae', 'mse']):
     if df is None or df.empty: